@@ -6,9 +6,14 @@ Temperature Monitoring Dashboard
 (Hour Fix: 24th hour now appears correctly everywhere)
 """
 
+import io
+from concurrent.futures import ThreadPoolExecutor
+import requests
 import streamlit as st
 import pandas as pd
-from datetime import datetime, date, timedelta, time
+import numpy as np
+import polars as pl
+from datetime import date
 import plotly.graph_objects as go
 
 # -------------------------------
@@ -26,62 +31,92 @@ gsheet_url = "https://docs.google.com/spreadsheets/d/1VxXJUP-tFMU1UaXNmBXut_wk5F
 # -------------------------------
 # LOAD & TRANSFORM FUNCTION
 # -------------------------------
-@st.cache_data
+def _fetch_bytes(url):
+    resp = requests.get(url, timeout=60)
+    resp.raise_for_status()
+    return resp.content
+
+
+@st.cache_data(ttl=600)
 def load_all_channels(url):
-    xls = pd.ExcelFile(url)
+    # Download once and reuse the same workbook for every sheet
+    data = _fetch_bytes(url)
+    xls = pd.ExcelFile(io.BytesIO(data), engine="calamine")
     real_sheets = xls.sheet_names
     clean_sheets = [s.strip() for s in real_sheets]
     sheet_map = dict(zip(clean_sheets, real_sheets))
+    # Shared categories so concatenated channels stay categorical
+    channel_dtype = pd.CategoricalDtype(clean_sheets)
 
-    channels = {}
+    # The workbook is read on this thread; only the reshape runs in the pool
+    tasks = [
+        (clean, pd.read_excel(xls, sheet_name=sheet_map[clean], header=3))
+        for clean in clean_sheets
+    ]
 
-    for clean in clean_sheets:
-        real = sheet_map[clean]
-        df = pd.read_excel(url, sheet_name=real, header=3)
+    def _process(args):
+        clean, df = args
         df = df.dropna(axis=1, how="all")
 
-        df_long = df.melt(id_vars=["Date"], var_name="Hour", value_name="Temperature")
-        df_long = df_long.dropna(subset=["Date", "Temperature"])
-
-        df_long["Channel"] = clean
-        df_long["Date"] = pd.to_datetime(df_long["Date"], errors="coerce")
-
-        # BaseDate = original real date
-        df_long["BaseDate"] = df_long["Date"].dt.date
-
-        # ---- HOUR CLEANING ----
-        df_long["Hour"] = df_long["Hour"].astype(str).str.strip()
-        df_long["Hour"] = df_long["Hour"].str.extract(r"(\d+)")
-        df_long["Hour_int"] = pd.to_numeric(df_long["Hour"], errors="coerce")
-
-        df_long = df_long.dropna(subset=["Hour_int"])
-        df_long["Hour_int"] = df_long["Hour_int"].astype(int)
-
-        # ---- TIMESTAMP FIX ----
-        timestamps = []
-        for _, r in df_long.iterrows():
-            base = r["BaseDate"]
-            h = int(r["Hour_int"])
-
-            if h == 24:
-                ts = datetime.combine(base, time(23, 59))
-            else:
-                ts = datetime.combine(base, time(h, 0))
-
-            timestamps.append(ts)
-
-        df_long["Timestamp"] = pd.to_datetime(timestamps)
+        # Coerce to clean dtypes so the frame hands over to Polars as-is
+        df.columns = df.columns.astype(str)
+        hour_cols = [c for c in df.columns if c != "Date"]
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+        df[hour_cols] = df[hour_cols].apply(pd.to_numeric, errors="coerce")
+
+        df_long = (
+            pl.from_pandas(df)
+            .lazy()
+            .unpivot(index="Date", variable_name="Hour", value_name="Temperature")
+            .drop_nulls(["Date", "Temperature"])
+            .with_columns(
+                # BaseDate = original real date
+                pl.col("Date").dt.date().alias("BaseDate"),
+                # ---- HOUR CLEANING ----
+                pl.col("Hour").str.extract(r"(\d+)").cast(pl.Int64, strict=False).alias("Hour_int"),
+                pl.lit(clean).alias("Channel"),
+            )
+            .drop_nulls("Hour_int")
+            # ---- TIMESTAMP FIX ----
+            # Hour 24 maps to 23:59 of the same BaseDate
+            .with_columns(
+                (
+                    pl.col("BaseDate").cast(pl.Datetime)
+                    + pl.when(pl.col("Hour_int") == 24)
+                    .then(pl.duration(hours=23, minutes=59))
+                    .otherwise(pl.duration(hours=pl.col("Hour_int")))
+                ).alias("Timestamp")
+            )
+            # Extra columns, downcast to keep the cached frames small
+            .with_columns(
+                pl.col("Timestamp").dt.week().cast(pl.Int8).alias("ISO_Week"),
+                pl.col("Timestamp").dt.iso_year().cast(pl.Int16).alias("Year"),
+                # Month start as a plain datetime rather than a pandas Period
+                pl.col("Timestamp").dt.truncate("1mo").alias("MonthStart"),
+                pl.col("Hour_int").cast(pl.Int8),
+                # Year-independent safe-range flag reused by every panel
+                pl.col("Temperature").is_between(DESIRED_MIN, DESIRED_MAX).alias("InRange"),
+            )
+            .drop("Date", "Hour")
+            # Chronological day/hour order
+            .sort(["BaseDate", "Hour_int"], maintain_order=True)
+            .collect()
+            .to_pandas()
+        )
 
-        # Extra columns
-        df_long["Date_only"] = df_long["Timestamp"].dt.date
-        df_long["MonthPeriod"] = df_long["Timestamp"].dt.to_period("M")
-        df_long["ISO_Week"] = df_long["Timestamp"].dt.isocalendar().week
-        df_long["Year"] = df_long["Timestamp"].dt.isocalendar().year
+        df_long["Channel"] = df_long["Channel"].astype(channel_dtype)
+        # Arrow-backed numerics; timestamps stay numpy datetime64
+        df_long = df_long.astype({
+            "Temperature": "float64[pyarrow]",
+            "Hour_int": "int8[pyarrow]",
+            "ISO_Week": "int8[pyarrow]",
+            "Year": "int16[pyarrow]"
+        })
 
-        df_long["Temperature"] = pd.to_numeric(df_long["Temperature"], errors="coerce")
-        df_long = df_long.dropna(subset=["Temperature"])
+        return clean, df_long
 
-        channels[clean] = df_long
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(tasks)))) as ex:
+        channels = dict(ex.map(_process, tasks))
 
     return channels
 
@@ -100,11 +135,12 @@ default_index = all_years.index(current_year) if current_year in all_years else
 
 selected_year = st.sidebar.selectbox("Select Year", options=all_years, index=default_index)
 
-channels = {
-    ch: df[df["Year"] == selected_year]
-    for ch, df in channels.items()
-    if not df[df["Year"] == selected_year].empty
-}
+filtered = {}
+for ch, df in channels.items():
+    mask = df["Year"].to_numpy() == selected_year
+    if mask.any():
+        filtered[ch] = df.iloc[mask]
+channels = filtered
 
 channel_names = list(channels.keys())
 
@@ -114,69 +150,164 @@ if not channel_names:
 
 
 # ---------------------------------------------
-# DONUT KPI
+# PRECOMPUTED AGGREGATES
 # ---------------------------------------------
-def donut_kpi(channel_name, df_channel, color="#2ca02c"):
-    total = len(df_channel)
-    safe_count = df_channel["Temperature"].between(DESIRED_MIN, DESIRED_MAX).sum()
-    out_count = total - safe_count
+@st.cache_data(ttl=600, show_spinner=False)
+def build_aggregates(url, year):
+    # Same TTL as the loader, so aggregates refresh along with the data
+    big = pd.concat(
+        [df.iloc[df["Year"].to_numpy() == year] for df in load_all_channels(url).values()],
+        ignore_index=True
+    )
 
-    safe_plot = safe_count if safe_count > 0 else 0.0001
-    out_plot = out_count if out_count > 0 else 0.0001
+    # One groupby per aggregate across all channels, split per channel after
+    big = big.assign(
+        OutOfRange=~big["InRange"],
+        HourDisplay=big["Hour_int"].replace({0: 24})
+    )
 
-    safe_str = f"{safe_count:,}"
-    out_str = f"{out_count:,}"
+    # Weekly averages
+    weekly_all = big.groupby(
+        ["Channel", "Year", "ISO_Week"], observed=True
+    )["Temperature"].mean().reset_index()
+    weekly_all["Label"] = weekly_all["Year"].astype(str) + "-W" + weekly_all["ISO_Week"].astype(str)
 
-    out_pct = round((out_count / total) * 100, 1) if total else 0
+    # Monthly averages
+    monthly_all = big.groupby(
+        ["Channel", "MonthStart"], observed=True
+    )["Temperature"].mean().reset_index()
+    monthly_all["MonthLabel"] = monthly_all["MonthStart"].dt.strftime("%b %Y")
+
+    # Summary stats and donut counts
+    stats_all = big.groupby("Channel", sort=False, observed=True).agg(
+        AvgTemp=("Temperature", "mean"),
+        MinTemp=("Temperature", "min"),
+        MaxTemp=("Temperature", "max"),
+        Total=("Temperature", "size"),
+        Safe=("InRange", "sum"),
+        LatestDay=("BaseDate", "max")
+    )
 
-    fig = go.Figure()
-    fig.add_trace(go.Pie(
+    # Out-of-range counts per month and display hour, binned with
+    # np.bincount over a dense (channel, month, hour) key
+    month_codes, months = pd.factorize(big["MonthStart"], sort=True)
+    # int64 codes: int8 category codes would overflow in the key arithmetic
+    ch_codes = big["Channel"].cat.codes.to_numpy(dtype=np.int64)
+    hour_arr = big["HourDisplay"].to_numpy(dtype="int64")
+    n_ch = len(big["Channel"].cat.categories)
+    n_hours = max(25, int(hour_arr.max()) + 1)
+    shape = (n_ch, len(months), n_hours)
+    key = (ch_codes * len(months) + month_codes) * n_hours + hour_arr
+    readings = np.bincount(key, minlength=np.prod(shape)).reshape(shape)
+    out = np.bincount(key[big["OutOfRange"].to_numpy()], minlength=np.prod(shape)).reshape(shape)
+
+    weekly = dict(tuple(weekly_all.groupby("Channel", sort=False, observed=True)))
+    monthly = dict(tuple(monthly_all.groupby("Channel", sort=False, observed=True)))
+    peak = {
+        ch: {
+            month: (np.flatnonzero(readings[i, j]), out[i, j][readings[i, j] > 0])
+            for j, month in enumerate(months)
+            if readings[i, j].any()
+        }
+        for i, ch in enumerate(big["Channel"].cat.categories)
+    }
+
+    return {
+        row.Index: {
+            "weekly": weekly[row.Index],
+            "monthly": monthly[row.Index],
+            "summary": {
+                "Channel": row.Index,
+                "AvgTemp": row.AvgTemp,
+                "MinTemp": row.MinTemp,
+                "MaxTemp": row.MaxTemp
+            },
+            "donut_counts": (int(row.Total), int(row.Safe)),
+            "peak_hours": peak[row.Index],
+            "latest_month": max(peak[row.Index]),
+            "latest_day": row.LatestDay
+        }
+        for row in stats_all.itertuples()
+    }
+
+
+aggs = build_aggregates(gsheet_url, selected_year)
+
+
+# ---------------------------------------------
+# FIGURE TEMPLATES
+# ---------------------------------------------
+def _template_dict(fig):
+    # Without the embedded theme, go.Figure() applies the default one
+    # instead of re-validating a full copy of it on every call
+    spec = fig.to_dict()
+    spec["layout"].pop("template", None)
+    return spec
+
+
+# ---------------------------------------------
+# DONUT KPI
+# ---------------------------------------------
+# Fixed trace/layout built once; donut_kpi only fills in the numbers
+DONUT_TEMPLATE = _template_dict(go.Figure(
+    go.Pie(
         labels=["Safe", "Out-of-Range"],
-        values=[safe_plot, out_plot],
         hole=0.65,
-        marker=dict(colors=[color, "#eaeaea"]),
+        marker=dict(colors=["#2ca02c", "#eaeaea"]),
         sort=False,
-        textinfo="none",
-        hovertemplate=
-            "Safe Range Readings: " + safe_str +
-            "<br>Out-of-Range Readings: " + out_str +
-            "<extra></extra>"
-    ))
-
-    percent = round((safe_count / total) * 100, 1) if total else 0
-
-    fig.update_layout(
+        textinfo="none"
+    ),
+    layout=dict(
         margin=dict(l=5, r=5, t=5, b=5),
         showlegend=False,
         annotations=[
             {
-                "text": f"<b>{percent}%</b><br>{channel_name}",
                 "x": 0.5, "y": 0.55,
                 "showarrow": False,
                 "font": dict(size=14)
             },
             {
-                "text": f"{out_pct}% Out of Range",
                 "x": 0.5, "y": 0.32,
                 "showarrow": False,
                 "font": dict(size=12, color="red")
             }
         ]
     )
+))
+
+
+def donut_kpi(channel_name, donut_counts, color="#2ca02c"):
+    total, safe_count = donut_counts
+    out_count = total - safe_count
+
+    safe_plot = safe_count if safe_count > 0 else 0.0001
+    out_plot = out_count if out_count > 0 else 0.0001
+
+    safe_str = f"{safe_count:,}"
+    out_str = f"{out_count:,}"
+
+    out_pct = round((out_count / total) * 100, 1) if total else 0
+    percent = round((safe_count / total) * 100, 1) if total else 0
+
+    fig = go.Figure(DONUT_TEMPLATE)
+    pie = fig.data[0]
+    pie.values = [safe_plot, out_plot]
+    pie.marker.colors = [color, "#eaeaea"]
+    pie.hovertemplate = (
+        "Safe Range Readings: " + safe_str +
+        "<br>Out-of-Range Readings: " + out_str +
+        "<extra></extra>"
+    )
+    fig.layout.annotations[0].text = f"<b>{percent}%</b><br>{channel_name}"
+    fig.layout.annotations[1].text = f"{out_pct}% Out of Range"
     return fig
 
 
 # ---------------------------------------------
 # SUMMARY BAR CHART
 # ---------------------------------------------
-def channel_temp_summary_df(channels_dict):
-    return pd.DataFrame([
-        {"Channel": ch,
-         "AvgTemp": df["Temperature"].mean(),
-         "MinTemp": df["Temperature"].min(),
-         "MaxTemp": df["Temperature"].max()}
-        for ch, df in channels_dict.items()
-    ])
+def channel_temp_summary_df(aggs_dict):
+    return pd.DataFrame([agg["summary"] for agg in aggs_dict.values()])
 
 def plot_channel_summary_bars(df_summary):
     fig = go.Figure()
@@ -198,89 +329,72 @@ def add_safe_lines(fig):
 # ---------------------------------------------
 # TODAY PANEL
 # ---------------------------------------------
+TODAY_TEMPLATE = go.Figure(
+    go.Scatter(mode="lines+markers", line=dict(color="royalblue")),
+    layout=dict(height=260, xaxis=dict(tickmode="array", type="linear"))
+)
+add_safe_lines(TODAY_TEMPLATE)
+TODAY_TEMPLATE = _template_dict(TODAY_TEMPLATE)
+
+
 def small_today_hourly(df_channel):
     latest_day = df_channel["BaseDate"].max()
-    df_day = df_channel[df_channel["BaseDate"] == latest_day].copy()
+    df_day = df_channel[df_channel["BaseDate"] == latest_day]
 
     if df_day.empty:
         return None
 
-    df_day["HourDisplay"] = df_day["Hour_int"].replace({0: 24})
-    df_day = df_day.sort_values("HourDisplay")
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=df_day["HourDisplay"].astype(int),
-        y=df_day["Temperature"],
-        mode="lines+markers",
-        line=dict(color="royalblue")
-    ))
-
-    add_safe_lines(fig)
-
-    fig.update_layout(
-        title=f"Today ({latest_day})",
-        height=260,
-        xaxis=dict(
-            tickmode="array",
-            tickvals=df_day["HourDisplay"],
-            type="linear"
-        )
-    )
+    hour_int = df_day["Hour_int"].to_numpy(dtype="int64")
+    hour_display = np.where(hour_int == 0, 24, hour_int)
+    # Loader order is chronological, so hour 0 (shown as 24) must move last
+    order = np.argsort(hour_display, kind="stable")
+    hour_display = hour_display[order]
+
+    fig = go.Figure(TODAY_TEMPLATE)
+    fig.data[0].x = hour_display
+    fig.data[0].y = df_day["Temperature"].to_numpy()[order]
+    fig.layout.title.text = f"Today ({latest_day:%Y-%m-%d})"
+    fig.layout.xaxis.tickvals = hour_display
     return fig
 
 
 # ---------------------------------------------
 # WEEKLY PANEL
 # ---------------------------------------------
-def small_weekly(df_channel):
-    df_w = df_channel.groupby(
-        [df_channel["Year"], df_channel["ISO_Week"]]
-    )["Temperature"].mean().reset_index()
-
-    df_w["Label"] = df_w["Year"].astype(str) + "-W" + df_w["ISO_Week"].astype(str)
-
-    fig = go.Figure(go.Scatter(x=df_w["Label"], y=df_w["Temperature"], mode="lines+markers"))
-    add_safe_lines(fig)
-    fig.update_layout(title="Weekly Avg Temp", height=260)
+WEEKLY_TEMPLATE = go.Figure(
+    go.Scatter(mode="lines+markers"),
+    layout=dict(title="Weekly Avg Temp", height=260)
+)
+add_safe_lines(WEEKLY_TEMPLATE)
+WEEKLY_TEMPLATE = _template_dict(WEEKLY_TEMPLATE)
+
+
+def small_weekly(df_w):
+    fig = go.Figure(WEEKLY_TEMPLATE)
+    fig.data[0].x = df_w["Label"]
+    fig.data[0].y = df_w["Temperature"]
     return fig
 
 
 # ---------------------------------------------
 # MONTHLY PANEL (Lollipop Chart)
 # ---------------------------------------------
-def small_monthly(df_channel):
-
-    df_m = df_channel.groupby(df_channel["MonthPeriod"].astype(str))["Temperature"].mean().reset_index()
-    df_m.rename(columns={"MonthPeriod": "Month"}, inplace=True)
-
-    df_m["Month"] = pd.to_datetime(df_m["Month"])
-    df_m = df_m.sort_values("Month")
-    df_m["MonthLabel"] = df_m["Month"].dt.strftime("%b %Y")
-
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=df_m["MonthLabel"],
-        y=df_m["Temperature"],
-        mode="lines",
-        line=dict(color="lightgray", width=3),
-        hoverinfo="skip",
-        showlegend=False
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=df_m["MonthLabel"],
-        y=df_m["Temperature"],
-        mode="markers",
-        marker=dict(size=14, color="royalblue"),
-        name="Avg Temp",
-        hovertemplate="Month: %{x}<br>Avg Temp: %{y}°C<extra></extra>"
-    ))
-
-    add_safe_lines(fig)
-
-    fig.update_layout(
+MONTHLY_TEMPLATE = go.Figure(
+    [
+        go.Scatter(
+            mode="lines",
+            line=dict(color="lightgray", width=3),
+            hoverinfo="skip",
+            showlegend=False
+        ),
+        go.Scatter(
+            mode="markers",
+            marker=dict(size=14, color="royalblue"),
+            name="Avg Temp",
+            hovertemplate="Month: %{x}<br>Avg Temp: %{y}°C<extra></extra>"
+        )
+    ],
+    layout=dict(
         title="Monthly Avg Temp (Lollipop Chart)",
         height=300,
         xaxis_title="Month",
@@ -288,7 +402,42 @@ def small_monthly(df_channel):
         xaxis=dict(tickangle=-45),
         margin=dict(l=40, r=20, t=60, b=40)
     )
+)
+add_safe_lines(MONTHLY_TEMPLATE)
+MONTHLY_TEMPLATE = _template_dict(MONTHLY_TEMPLATE)
+
+
+def small_monthly(df_m):
+    fig = go.Figure(MONTHLY_TEMPLATE)
+    for trace in fig.data:
+        trace.x = df_m["MonthLabel"]
+        trace.y = df_m["Temperature"]
+    return fig
+
+
+# ---------------------------------------------
+# PEAK HOURS CHART
+# ---------------------------------------------
+PEAK_TEMPLATE = _template_dict(go.Figure(
+    go.Bar(marker_color="crimson"),
+    layout=dict(
+        xaxis_title="Hour",
+        yaxis_title="Out-of-Range Count",
+        height=450,
+        xaxis=dict(tickmode="array")
+    )
+))
 
+
+def peak_hours_chart(channel_name, month, hours, counts):
+    hours = hours.tolist()
+
+    fig = go.Figure(PEAK_TEMPLATE)
+    fig.data[0].x = hours
+    fig.data[0].y = counts.tolist()
+    fig.layout.title.text = f"Out-of-Range Frequency by Hour — {channel_name} ({month:%Y-%m})"
+    fig.layout.xaxis.tickvals = hours
+    fig.layout.xaxis.ticktext = [str(h) for h in hours]
     return fig
 
 
@@ -298,14 +447,14 @@ def small_monthly(df_channel):
 st.markdown("## Channel Compliance")
 cols = st.columns(len(channel_names))
 for i, ch in enumerate(channel_names):
-    cols[i].plotly_chart(donut_kpi(ch, channels[ch]), use_container_width=True)
+    cols[i].plotly_chart(donut_kpi(ch, aggs[ch]["donut_counts"]), use_container_width=True)
 
 
 # -----------------------------------------------
 # SUMMARY
 # -----------------------------------------------
 st.markdown("---")
-df_summary = channel_temp_summary_df(channels)
+df_summary = channel_temp_summary_df(aggs)
 st.plotly_chart(plot_channel_summary_bars(df_summary), use_container_width=True)
 
 
@@ -325,8 +474,8 @@ for ch in channel_names:
     else:
         col1.info("Only available for current year")
 
-    col2.plotly_chart(small_weekly(channels[ch]), use_container_width=True)
-    col3.plotly_chart(small_monthly(channels[ch]), use_container_width=True)
+    col2.plotly_chart(small_weekly(aggs[ch]["weekly"]), use_container_width=True)
+    col3.plotly_chart(small_monthly(aggs[ch]["monthly"]), use_container_width=True)
 
 
 # -----------------------------------------------
@@ -335,17 +484,12 @@ for ch in channel_names:
 st.markdown("---")
 st.subheader("Peak Out-of-Range Hours — Latest Month")
 
-latest_month = None
-for ch, dfc in channels.items():
-    if not dfc.empty:
-        m = dfc["MonthPeriod"].max()
-        if latest_month is None or m > latest_month:
-            latest_month = m
+latest_month = max((agg["latest_month"] for agg in aggs.values()), default=None)
 
 if latest_month is None:
     st.info("No monthly data available.")
 else:
-    st.write(f"Latest Month: **{latest_month}**")
+    st.write(f"Latest Month: **{latest_month:%Y-%m}**")
 
     selected_channel = st.radio(
         "Select Channel",
@@ -353,55 +497,17 @@ else:
         horizontal=True
     )
 
-    dfc = channels[selected_channel]
-    dfm = dfc[dfc["MonthPeriod"] == latest_month].copy()
+    peak = aggs[selected_channel]["peak_hours"].get(latest_month)
 
-    if dfm.empty:
+    if peak is None:
         st.info(f"No data for {selected_channel} in the latest month.")
     else:
 
-        dfm["HourDisplay"] = dfm["Hour_int"].replace({0: 24})
-        unique_hours = sorted(dfm["HourDisplay"].unique())
-
-        df_out = dfm[~dfm["Temperature"].between(DESIRED_MIN, DESIRED_MAX)].copy()
-
-        if df_out.empty:
-            st.info(f"No out-of-range values for {selected_channel} in {latest_month}.")
-
-            df_hour = pd.DataFrame({
-                "HourDisplay": unique_hours,
-                "Count": [0] * len(unique_hours)
-            })
-
-        else:
-            df_out["HourDisplay"] = df_out["Hour_int"].replace({0: 24})
-            df_hour = df_out.groupby("HourDisplay").size().reset_index(name="Count")
-            df_hour = df_hour.set_index("HourDisplay").reindex(unique_hours, fill_value=0).reset_index()
-
-        hours = df_hour["HourDisplay"].tolist()
-        counts = df_hour["Count"].tolist()
-
-        fig_peak = go.Figure()
-        fig_peak.add_trace(
-            go.Bar(
-                x=hours,
-                y=counts,
-                marker_color="crimson"
-            )
-        )
-
-        fig_peak.update_layout(
-            title=f"Out-of-Range Frequency by Hour — {selected_channel} ({latest_month})",
-            xaxis_title="Hour",
-            yaxis_title="Out-of-Range Count",
-            height=450,
-            xaxis=dict(
-                tickmode="array",
-                tickvals=hours,
-                ticktext=[str(h) for h in hours]
-            )
-        )
+        hours, counts = peak
+        if counts.sum() == 0:
+            st.info(f"No out-of-range values for {selected_channel} in {latest_month:%Y-%m}.")
 
+        fig_peak = peak_hours_chart(selected_channel, latest_month, hours, counts)
         st.plotly_chart(fig_peak, use_container_width=True)
 
 
@@ -413,7 +519,7 @@ if latest_month and selected_channel:
     st.markdown("### Drilldown: Hour-wise Readings (Latest Month)")
 
     dfc = channels[selected_channel]
-    dfm = dfc[dfc["MonthPeriod"] == latest_month].copy()
+    dfm = dfc[dfc["MonthStart"] == latest_month].copy()
 
     if not dfm.empty:
 
@@ -424,9 +530,7 @@ if latest_month and selected_channel:
 
         df_hr = dfm[dfm["HourDisplay"] == selected_hour].copy()
 
-        df_hr["Color"] = df_hr["Temperature"].apply(
-            lambda x: "crimson" if not (DESIRED_MIN <= x <= DESIRED_MAX) else "royalblue"
-        )
+        df_hr["Color"] = df_hr["InRange"].map({True: "royalblue", False: "crimson"})
 
         fig_drill = go.Figure()
         fig_drill.add_trace(go.Bar(
@@ -451,28 +555,25 @@ if latest_month and selected_channel:
 st.markdown("---")
 st.subheader("Alerts Summary (Latest Available Date)")
 
-latest_real_day = max(dfc["BaseDate"].max() for dfc in channels.values())
+latest_real_day = max(agg["latest_day"] for agg in aggs.values())
 
-st.write(f"Latest Date in Dataset: **{latest_real_day}**")
-
-alerts = []
+st.write(f"Latest Date in Dataset: **{latest_real_day:%Y-%m-%d}**")
 
+pieces = []
 for ch, dfc in channels.items():
-    df_today = dfc[dfc["BaseDate"] == latest_real_day]
-    out = df_today[~df_today["Temperature"].between(DESIRED_MIN, DESIRED_MAX)]
-
-    for _, r in out.iterrows():
-        alerts.append({
-            "Channel": ch,
-            "Timestamp": r["Timestamp"],
-            "Temp": r["Temperature"]
-        })
+    sub = dfc.loc[
+        (dfc["BaseDate"] == latest_real_day) & ~dfc["InRange"],
+        ["Timestamp", "Temperature"]
+    ].rename(columns={"Temperature": "Temp"})
+    sub.insert(0, "Channel", ch)
+    pieces.append(sub)
+
+df_alert = pd.concat(pieces, ignore_index=True) if pieces else pd.DataFrame()
 
-if alerts:
-    df_alert = pd.DataFrame(alerts)
+if not df_alert.empty:
     df_alert["Timestamp"] = df_alert["Timestamp"].dt.strftime("%Y-%m-%d %H:%M")
     df_alert.index = df_alert.index + 1
     df_alert.index.name = "Sl No"
     st.table(df_alert)
 else:
-    st.success(f"No out-of-range readings on {latest_real_day}.")
+    st.success(f"No out-of-range readings on {latest_real_day:%Y-%m-%d}.")